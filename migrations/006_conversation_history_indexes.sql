@@ -0,0 +1,15 @@
+-- Composite indexes for the bot's hot conversation queries
+
+-- History fetch: WHERE user_id = ? AND agent_type = ? ORDER BY created_at DESC LIMIT n
+-- The message column is deliberately not INCLUDEd: assistant replies can exceed
+-- the btree tuple size limit and would make inserts fail.
+CREATE INDEX IF NOT EXISTS idx_conversations_history
+    ON conversations (user_id, agent_type, created_at DESC);
+
+-- Stats counts: WHERE user_id = ? [AND agent_type = ?] AND role = 'user'
+CREATE INDEX IF NOT EXISTS idx_conversations_user_counts
+    ON conversations (user_id, agent_type)
+    WHERE role = 'user';
+
+-- user_sessions(user_id) is already covered by its UNIQUE constraint and
+-- idx_user_sessions_user_id from 001_initial_schema.sql.
@@ -72,7 +72,7 @@ class AIAgent:
         
         # Log citation processing results
         if references:
-            logger.debug(f"Standard citation format detected: {len(references)} references found")
+            logger.debug("Standard citation format detected: %s references found", len(references))
         
         return formatted_content
 
@@ -116,7 +116,7 @@ class AIAgent:
             content_with_links = re.sub(r'\[([0-9,\s]+)\]', replace_inline_citation, content_without_sources)
             
             # Log Perplexity citation processing
-            logger.debug(f"Perplexity citation format detected: {len(sources)} sources found")
+            logger.debug("Perplexity citation format detected: %s sources found", len(sources))
             
             return content_with_links
         
@@ -219,7 +219,7 @@ class AIAgent:
         We avoid emitting raw HTML or complex Markdown. The caller will escape
         with MarkdownV2 and handle minimal styling.
         """
-        logger.debug(f"Raw content before citation parsing: {content[:500]}")
+        logger.debug("Raw content before citation parsing: %s", content[:500])
 
         # First, flatten any markdown tables into readable lists
         content = self._flatten_markdown_tables(content)
@@ -349,14 +349,22 @@ class AIAgent:
         agent_type: str,
         messages: list[dict[str, str]],
         user_message: str,
+        system_suffix: str = "",
     ) -> tuple[str, int]:
-        """Get AI response for the given agent type."""
+        """Get AI response for the given agent type.
+
+        ``system_suffix`` is appended to the agent's system prompt, keeping
+        per-conversation context out of the user's own message.
+        """
         try:
             agent = self.agents[agent_type]
 
             # Build message history
+            system_prompt = agent["system_prompt"]
+            if system_suffix:
+                system_prompt = f"{system_prompt}\n\n{system_suffix}"
             formatted_messages = [
-                {"role": "system", "content": agent["system_prompt"]},
+                {"role": "system", "content": system_prompt},
             ]
 
             # Add conversation history
@@ -377,12 +385,13 @@ class AIAgent:
             )
 
             # Get AI response
-            logger.debug(f"Calling OpenRouter with model: {agent['model']}")
+            logger.debug("Calling OpenRouter with model: %s", agent["model"])
             response = await self.client.chat.completions.create(
                 model=agent["model"],
                 messages=formatted_messages,
                 max_tokens=800,
                 temperature=0.7,
+                extra_body={"prompt_cache_key": agent["prompt_cache_key"]},
             )
             logger.debug("Response received successfully")
 
@@ -395,7 +404,7 @@ class AIAgent:
             return formatted_content, tokens
 
         except Exception as e:
-            logger.error(f"Error getting AI response: {e}")
+            logger.error("Error getting AI response: %s", e)
 
             # Specific error handling for different types of failures
             error_str = str(e).lower()
@@ -1,6 +1,10 @@
 """Bot configuration and constants."""
 
+import hashlib
 import os
+import sys
+from collections.abc import Mapping
+from types import MappingProxyType
 
 from dotenv import load_dotenv
 
@@ -30,7 +34,7 @@ if missing_vars:
 BOT_USERNAME = "starknet_advisor_bot"  # Your bot's username
 
 # Agent configurations with Perplexity models
-AGENTS: dict[str, dict] = {
+_AGENT_CONFIGS: dict[str, dict[str, str]] = {
     "pm": {
         "name": "🚀 Product Manager",
         "description": "Product strategy expert based on Lenny Rachitsky's frameworks",
@@ -105,10 +109,47 @@ Formatting rules:
     },
 }
 
+# System prompts are static: intern them and fingerprint each one so the
+# provider can reuse its cached prompt prefix across requests
+for _agent in _AGENT_CONFIGS.values():
+    _agent["system_prompt"] = sys.intern(_agent["system_prompt"])
+    _agent["prompt_cache_key"] = hashlib.blake2b(
+        _agent["system_prompt"].encode(),
+        digest_size=8,
+    ).hexdigest()
+
+# Agent settings are fixed once loaded; expose them read-only
+AGENTS: Mapping[str, Mapping[str, str]] = MappingProxyType(
+    {key: MappingProxyType(agent) for key, agent in _AGENT_CONFIGS.items()},
+)
+
 # Rate limiting
 RATE_LIMIT_MESSAGES = 30  # messages per user per hour
 RATE_LIMIT_WINDOW = 3600  # 1 hour in seconds
 
 # Message settings
 MAX_MESSAGE_LENGTH = 2000
-MAX_HISTORY_MESSAGES = 10  # How many previous messages to include in context
\ No newline at end of file
+MAX_HISTORY_MESSAGES = 10  # How many previous messages to include in context
+
+# Telegram Bot API HTTP client
+TELEGRAM_CONNECTION_POOL_SIZE = 256  # Concurrent outbound requests
+TELEGRAM_POOL_TIMEOUT = 20.0  # Seconds to wait for a free connection
+TELEGRAM_CONNECT_TIMEOUT = 10.0
+TELEGRAM_READ_TIMEOUT = 30.0
+TELEGRAM_WRITE_TIMEOUT = 30.0
+TELEGRAM_CONCURRENT_UPDATES = 256  # Updates handled at once, serialized per user
+
+# Cached answers to opening questions (no conversation history)
+RESPONSE_CACHE_SIZE = 1000
+RESPONSE_CACHE_TTL = 300  # seconds
+
+# Worker threads for blocking Supabase calls
+DB_EXECUTOR_WORKERS = 16
+
+# Analytics batching
+ANALYTICS_BATCH_SIZE = 50  # Max events per bulk insert
+ANALYTICS_FLUSH_INTERVAL = 2.0  # Seconds to wait for a batch to fill
+ANALYTICS_QUEUE_SIZE = 10_000  # Events buffered before new ones are dropped
+
+# Rate limiter housekeeping
+RATE_LIMIT_SWEEP_INTERVAL = 300  # Seconds between idle-bucket sweeps
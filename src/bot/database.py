@@ -1,7 +1,11 @@
 """Database operations using Supabase."""
 
+import asyncio
 import logging
 import os
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
 from datetime import UTC, datetime
 
 from dotenv import load_dotenv
@@ -11,15 +15,71 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Columns needed to rebuild LLM context; avoids decoding unused fields
+HISTORY_COLUMNS = "role, message, created_at"
+
+# In-process conversation history cache
+HISTORY_CACHE_SIZE = 20  # Messages kept per (user_id, agent_type)
+HISTORY_CACHE_MAX_KEYS = 10_000  # LRU bound on cached conversations
+
+# Minimum seconds between session upserts for an unchanged agent
+SESSION_UPDATE_INTERVAL = 60
+
 
 class Database:
-    """Handle all database operations."""
+    """Handle all database operations.
+
+    supabase-py is synchronous, so queries run in worker threads via
+    asyncio.to_thread to keep the event loop free.
+    """
 
     def __init__(self) -> None:
         self.client: Client = create_client(
             os.getenv("SUPABASE_URL"),
             os.getenv("SUPABASE_SERVICE_KEY"),
         )
+        # Newest HISTORY_CACHE_SIZE messages per conversation, chronological.
+        # Only this process writes conversations, so entries are kept in sync
+        # on save/clear instead of being re-read on every message.
+        self._history_cache: OrderedDict[tuple[str, str], list[dict]] = (
+            OrderedDict()
+        )
+        # Serializes cache-filling reads and writes of one conversation so a
+        # read can't cache rows that miss a concurrent insert
+        self._history_locks: dict[tuple[str, str], asyncio.Lock] = {}
+        # Bumped by clears spanning every agent: a read of a conversation the
+        # clear didn't lock must not cache rows from before the delete
+        self._history_epoch = 0
+        # user_id -> (monotonic time, agent_type) of the last session upsert,
+        # oldest first; entries past SESSION_UPDATE_INTERVAL are pruned
+        self._last_session_update: OrderedDict[str, tuple[float, str]] = (
+            OrderedDict()
+        )
+
+    def _cache_history(self, key: tuple[str, str], messages: list[dict]) -> None:
+        """Store history for a conversation, evicting the least recently used."""
+        self._history_cache[key] = messages[-HISTORY_CACHE_SIZE:]
+        self._history_cache.move_to_end(key)
+        while len(self._history_cache) > HISTORY_CACHE_MAX_KEYS:
+            evicted, _ = self._history_cache.popitem(last=False)
+            self._history_locks.pop(evicted, None)
+
+    def _history_lock(self, key: tuple[str, str]) -> asyncio.Lock:
+        """Return the lock guarding a conversation's cached history."""
+        lock = self._history_locks.get(key)
+        if lock is None:
+            lock = self._history_locks[key] = asyncio.Lock()
+        return lock
+
+    def _record_session_update(self, user_id: str, now: float, agent_type: str) -> None:
+        """Remember a session upsert and forget ones too old to debounce."""
+        self._last_session_update[user_id] = (now, agent_type)
+        self._last_session_update.move_to_end(user_id)
+        while True:
+            oldest, (updated, _) = next(iter(self._last_session_update.items()))
+            if now - updated < SESSION_UPDATE_INTERVAL:
+                break
+            del self._last_session_update[oldest]
 
     async def save_message(
         self,
@@ -33,24 +93,30 @@ class Database:
     ) -> dict:
         """Save a message to the database."""
         try:
-            result = (
-                self.client.table("conversations")
-                .insert(
-                    {
-                        "user_id": user_id,
-                        "username": username,
-                        "first_name": first_name,
-                        "agent_type": agent_type,
-                        "role": role,
-                        "message": message,
-                        "tokens_used": tokens_used,
-                    },
+            row = {
+                "user_id": user_id,
+                "username": username,
+                "first_name": first_name,
+                "agent_type": agent_type,
+                "role": role,
+                "message": message,
+                "tokens_used": tokens_used,
+            }
+            key = (user_id, agent_type)
+            async with self._history_lock(key):
+                result = await asyncio.to_thread(
+                    self.client.table("conversations").insert(row).execute,
                 )
-                .execute()
-            )
-            return result.data[0] if result.data else {}
+                saved = result.data[0] if result.data else {}
+
+                # Keep cached history in sync with the write
+                cached = self._history_cache.get(key)
+                if cached is not None:
+                    self._cache_history(key, [*cached, saved or row])
+
+            return saved
         except Exception as e:
-            logger.error(f"Error saving message: {e}")
+            logger.error("Error saving message: %s", e)
             raise
 
     async def get_conversation_history(
@@ -60,21 +126,32 @@ class Database:
         limit: int = 10,
     ) -> list[dict]:
         """Get recent conversation history."""
+        key = (user_id, agent_type)
+        cached = self._history_cache.get(key)
+        if cached is not None and limit <= HISTORY_CACHE_SIZE:
+            self._history_cache.move_to_end(key)
+            return cached[-limit:]
+
         try:
-            result = (
-                self.client.table("conversations")
-                .select("*")
-                .eq("user_id", user_id)
-                .eq("agent_type", agent_type)
-                .order("created_at", desc=True)
-                .limit(limit)
-                .execute()
-            )
+            async with self._history_lock(key):
+                epoch = self._history_epoch
+                result = await asyncio.to_thread(
+                    self.client.table("conversations")
+                    .select(HISTORY_COLUMNS)
+                    .eq("user_id", user_id)
+                    .eq("agent_type", agent_type)
+                    .order("created_at", desc=True)
+                    .limit(max(limit, HISTORY_CACHE_SIZE))
+                    .execute,
+                )
 
-            # Return in chronological order
-            return list(reversed(result.data)) if result.data else []
+                # Return in chronological order
+                history = list(reversed(result.data)) if result.data else []
+                if self._history_epoch == epoch:
+                    self._cache_history(key, history)
+            return history[-limit:]
         except Exception as e:
-            logger.error(f"Error getting conversation history: {e}")
+            logger.error("Error getting conversation history: %s", e)
             return []
 
     async def update_user_session(
@@ -85,19 +162,28 @@ class Database:
         agent_type: str,
     ) -> None:
         """Update or create user session."""
+        # Skip heartbeat-only writes; agent changes are always persisted
+        now = time.monotonic()
+        last = self._last_session_update.get(user_id)
+        if last and last[1] == agent_type and now - last[0] < SESSION_UPDATE_INTERVAL:
+            return
+
         try:
             # Upsert user session
-            self.client.table("user_sessions").upsert(
-                {
-                    "user_id": user_id,
-                    "username": username,
-                    "first_name": first_name,
-                    "current_agent": agent_type,
-                    "last_active": datetime.now(UTC).isoformat(),
-                },
-            ).execute()
+            await asyncio.to_thread(
+                self.client.table("user_sessions").upsert(
+                    {
+                        "user_id": user_id,
+                        "username": username,
+                        "first_name": first_name,
+                        "current_agent": agent_type,
+                        "last_active": datetime.now(UTC).isoformat(),
+                    },
+                ).execute,
+            )
+            self._record_session_update(user_id, now, agent_type)
         except Exception as e:
-            logger.error(f"Error updating user session: {e}")
+            logger.error("Error updating user session: %s", e)
 
     async def clear_conversation(
         self,
@@ -105,55 +191,77 @@ class Database:
         agent_type: str | None = None,
     ) -> None:
         """Clear conversation history for a user."""
+        # Hold the history locks of every affected conversation so an
+        # in-flight cold read can't re-cache rows from before the delete
+        if agent_type:
+            keys = [(user_id, agent_type)]
+        else:
+            keys = sorted(
+                key
+                for key in {*self._history_locks, *self._history_cache}
+                if key[0] == user_id
+            )
+
         try:
             query = self.client.table("conversations").delete().eq("user_id", user_id)
 
             if agent_type:
                 query = query.eq("agent_type", agent_type)
 
-            query.execute()
-            logger.info(f"Cleared conversations for user {user_id}")
+            async with AsyncExitStack() as stack:
+                for key in keys:
+                    await stack.enter_async_context(self._history_lock(key))
+
+                await asyncio.to_thread(query.execute)
+
+                # Drop cached history for the cleared conversations
+                for key in keys:
+                    self._history_cache.pop(key, None)
+                if not agent_type:
+                    self._history_epoch += 1
+
+            logger.info("Cleared conversations for user %s", user_id)
         except Exception as e:
-            logger.error(f"Error clearing conversations: {e}")
+            logger.error("Error clearing conversations: %s", e)
 
     async def get_user_stats(self, user_id: str) -> dict:
         """Get user statistics."""
         try:
-            # Get message counts
-            total_messages = (
-                self.client.table("conversations")
-                .select("id", count="exact")
-                .eq("user_id", user_id)
-                .eq("role", "user")
-                .execute()
-            )
-
-            pm_messages = (
-                self.client.table("conversations")
-                .select("id", count="exact")
-                .eq("user_id", user_id)
-                .eq("agent_type", "pm")
-                .eq("role", "user")
-                .execute()
-            )
-
-            vc_messages = (
-                self.client.table("conversations")
-                .select("id", count="exact")
-                .eq("user_id", user_id)
-                .eq("agent_type", "vc")
-                .eq("role", "user")
-                .execute()
-            )
-
-            # Get first message date
-            first_message = (
-                self.client.table("conversations")
-                .select("created_at")
-                .eq("user_id", user_id)
-                .order("created_at")
-                .limit(1)
-                .execute()
+            # Get message counts and first message date concurrently
+            total_messages, pm_messages, vc_messages, first_message = (
+                await asyncio.gather(
+                    asyncio.to_thread(
+                        self.client.table("conversations")
+                        .select("id", count="exact", head=True)
+                        .eq("user_id", user_id)
+                        .eq("role", "user")
+                        .execute,
+                    ),
+                    asyncio.to_thread(
+                        self.client.table("conversations")
+                        .select("id", count="exact", head=True)
+                        .eq("user_id", user_id)
+                        .eq("agent_type", "pm")
+                        .eq("role", "user")
+                        .execute,
+                    ),
+                    asyncio.to_thread(
+                        self.client.table("conversations")
+                        .select("id", count="exact", head=True)
+                        .eq("user_id", user_id)
+                        .eq("agent_type", "vc")
+                        .eq("role", "user")
+                        .execute,
+                    ),
+                    asyncio.to_thread(
+                        self.client.table("conversations")
+                        .select("created_at")
+                        .eq("user_id", user_id)
+                        .order("created_at")
+                        .limit(1)
+                        .execute,
+                    ),
+                )
             )
 
             return {
@@ -165,7 +273,7 @@ class Database:
                 ),
             }
         except Exception as e:
-            logger.error(f"Error getting user stats: {e}")
+            logger.error("Error getting user stats: %s", e)
             return {
                 "total_messages": 0,
                 "pm_messages": 0,
@@ -1,106 +1,78 @@
 """Telegram bot command handlers."""
 
+import asyncio
 import logging
 import re
+from collections.abc import Coroutine
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.constants import ChatAction, ParseMode
-from telegram.ext import ContextTypes
+from telegram.ext import Application, ContextTypes
 
 from .agents import AIAgent
-from .config import AGENTS
+from .config import (
+    AGENTS,
+    ANALYTICS_BATCH_SIZE,
+    ANALYTICS_FLUSH_INTERVAL,
+    ANALYTICS_QUEUE_SIZE,
+    DB_EXECUTOR_WORKERS,
+    MAX_HISTORY_MESSAGES,
+    RATE_LIMIT_SWEEP_INTERVAL,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+)
 from .database import Database
 from .utils import (
-    rate_limiter,
+    ResponseCache,
+    get_rate_limiter,
     normalize_query,
-    escape_md_v2,
-    split_into_chunks,
+    normalize_text,
+    prepare_reply,
     render_markdown_v2,
 )
 
 logger = logging.getLogger(__name__)
 
+# Topics used for conversation continuity, in reporting order
+_TOPIC_KEYWORDS = (
+    "product",
+    "users",
+    "market",
+    "growth",
+    "revenue",
+    "competition",
+    "funding",
+    "team",
+)
+_TOPIC_RE = re.compile("|".join(_TOPIC_KEYWORDS), re.IGNORECASE)
+
+# Mermaid code blocks are stripped from replies before sending
+_MERMAID_RE = re.compile(r"```mermaid[\s\S]*?```")
+
+# Static replies, built once at import time
+_START_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [
+            InlineKeyboardButton(
+                AGENTS["pm"]["name"],
+                callback_data="select_pm",
+            ),
+        ],
+        [
+            InlineKeyboardButton(
+                AGENTS["vc"]["name"],
+                callback_data="select_vc",
+            ),
+        ],
+    ],
+)
 
-class BotHandlers:
-    """Handles all bot commands and messages."""
-
-    def __init__(self) -> None:
-        self.db = Database()
-        self.ai = AIAgent()
-
-    async def log_analytics(self, user_id: str, action: str, metadata: dict = None):
-        """Log analytics events."""
-        try:
-            self.db.client.table("bot_analytics").insert(
-                {
-                    "user_id": user_id,
-                    "action": action,
-                    "metadata": metadata or {},
-                    "created_at": datetime.now(UTC).isoformat(),
-                }
-            ).execute()
-        except Exception:
-            pass  # Don't let analytics errors break the bot
-
-    async def get_conversation_summary(self, user_id: str, agent_type: str) -> str:
-        """Generate a summary of key points from conversation history."""
-        try:
-            # Get last 20 messages
-            history = await self.db.get_conversation_history(
-                user_id=user_id,
-                agent_type=agent_type,
-                limit=20
-            )
-            
-            if len(history) < 4:  # Not enough history
-                return ""
-            
-            # Extract key topics discussed
-            user_messages = [msg['message'] for msg in history if msg['role'] == 'user']
-            
-            # Simple keyword extraction for continuity
-            key_topics = []
-            keywords = ['product', 'users', 'market', 'growth', 'revenue', 'competition', 'funding', 'team']
-            
-            for keyword in keywords:
-                if any(keyword in msg.lower() for msg in user_messages):
-                    key_topics.append(keyword)
-            
-            if not key_topics:
-                return ""
-                
-            return f"Building on our discussion about {', '.join(key_topics[:3])}... "
-            
-        except Exception as e:
-            logger.error(f"Error generating conversation summary: {e}")
-            return ""
-
-    async def start(self, update: Update, _context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Handle /start command."""
-        user = update.effective_user
-
-        # Create agent selection keyboard
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    AGENTS["pm"]["name"],
-                    callback_data="select_pm",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    AGENTS["vc"]["name"],
-                    callback_data="select_vc",
-                )
-            ],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        welcome_message = f"""
+_WELCOME_TEMPLATE = """
 Welcome to Starknet Startup Advisor Bot (Beta).
 
-Hello {user.first_name}. I provide AI-powered guidance through two specialized advisors:
+Hello {first_name}. I provide AI-powered guidance through two specialized advisors:
 
 **Product Manager**
 Strategic product development guidance
@@ -119,23 +91,274 @@ Early-stage investment perspective
 Choose your advisor to begin:
 """
 
-        await update.message.reply_text(
-            welcome_message,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN,
+_HELP_TEXT = """
+**How to use this bot:**
+
+**Commands:**
+- /start - Choose your advisor
+- /pm - Switch to Product Manager
+- /vc - Switch to VC/Angel Investor  
+- /reset - Clear conversation history
+- /stats - View your usage stats
+- /help - Show this help message
+
+**Tips:**
+- Be specific about your startup/product
+- Ask follow-up questions
+- Share your challenges openly
+- The AI has internet access for current data
+
+**Beta Version**
+This bot is in beta. Your feedback helps improve it.
+Report bugs or suggestions to @espejelomar
+
+Current advisor: Check bot responses to see which mode is active.
+"""
+
+_STATS_TEMPLATE = """
+**Your Statistics**
+
+**User:** {first_name}
+**Member Since:** {member_since}
+**Days Active:** {days_active}
+
+**Total Messages:** {total_messages}
+- Product Manager: {pm_messages}
+- VC/Angel: {vc_messages}
+
+**Favorite Advisor:** {favorite}
+
+---
+Beta version - Feedback to @espejelomar
+"""
+
+_START_PROMPTS = {
+    agent_type: "\n- ".join(prompts)
+    for agent_type, prompts in {
+        "pm": [
+            "What problem are you solving?",
+            "Who is your target user?",
+            "What's your current product stage?",
+            "What are you struggling with?",
+        ],
+        "vc": [
+            "What's your business model?",
+            "How big is your market?",
+            "What's your competitive advantage?",
+            "What metrics are you tracking?",
+        ],
+    }.items()
+}
+
+_SELECT_PREFIX = "select_"
+
+_AGENT_INTRO = {
+    agent_type: f"""
+{AGENTS[agent_type]["name"]} selected.
+
+I'll challenge your thinking and ask probing questions to help refine your strategy.
+
+Start by sharing:
+- {prompts}
+
+Or tell me about your startup.
+
+Switch advisors anytime with /pm or /vc
+"""
+    for agent_type, prompts in _START_PROMPTS.items()
+}
+
+_SWITCH_MESSAGES = {
+    agent_type: f"✅ Switched to **{agent['name']}**\n\nHow can I help you?"
+    for agent_type, agent in AGENTS.items()
+}
+
+_RESET_MESSAGES = {
+    agent_type: (
+        "🔄 **Conversation Reset!**\n\n"
+        f"Your conversation history with {agent['name']} has been cleared.\n\n"
+        "Let's start fresh! What would you like to discuss?"
+    )
+    for agent_type, agent in AGENTS.items()
+}
+
+
+def _topics_from_history(history: list[dict]) -> str:
+    """Summarize key topics from conversation history for continuity."""
+    found: set[str] = set()
+    for msg in history:
+        if msg["role"] != "user":
+            continue
+        found.update(match.lower() for match in _TOPIC_RE.findall(msg["message"]))
+        if len(found) == len(_TOPIC_KEYWORDS):
+            break
+
+    # Report in keyword order, not order of appearance
+    key_topics = [keyword for keyword in _TOPIC_KEYWORDS if keyword in found][:3]
+    if not key_topics:
+        return ""
+    return f"Building on our discussion about {', '.join(key_topics)}... "
+
+
+# Shared clients, created on first use so every BotHandlers reuses the same
+# Supabase client and OpenRouter connection pool
+_db: Database | None = None
+_ai: AIAgent | None = None
+
+
+def _get_db() -> Database:
+    """Return the process-wide Database, creating it on first use."""
+    global _db
+    if _db is None:
+        _db = Database()
+    return _db
+
+
+def _get_ai() -> AIAgent:
+    """Return the process-wide AIAgent, creating it on first use."""
+    global _ai
+    if _ai is None:
+        _ai = AIAgent()
+    return _ai
+
+
+class BotHandlers:
+    """Handles all bot commands and messages."""
+
+    def __init__(self) -> None:
+        self.db = _get_db()
+        self.ai = _get_ai()
+        self.response_cache = ResponseCache(
+            max_entries=RESPONSE_CACHE_SIZE,
+            ttl_seconds=RESPONSE_CACHE_TTL,
+        )
+        # Analytics events; None is the shutdown sentinel for the flusher
+        self._analytics_queue: asyncio.Queue[dict | None] = asyncio.Queue(
+            maxsize=ANALYTICS_QUEUE_SIZE,
+        )
+        self._background_tasks: set[asyncio.Task] = set()
+        # Long-running tasks started by post_init
+        self._analytics_task: asyncio.Task | None = None
+        self._sweeper_task: asyncio.Task | None = None
+
+    def _spawn(self, coro: Coroutine) -> asyncio.Task:
+        """Run a coroutine in the background, logging instead of raising failures."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)  # Keep a reference until it finishes
+        task.add_done_callback(self._on_background_task_done)
+        return task
+
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        """Release a finished background task and report its error, if any."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning("Background task failed: %s", task.exception())
+
+    async def post_init(self, _application: Application) -> None:
+        """Start background tasks once the application's event loop is running."""
+        # Blocking supabase-py calls run in the loop's default executor
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=DB_EXECUTOR_WORKERS,
+                thread_name_prefix="supabase",
+            ),
         )
+        self._analytics_task = asyncio.create_task(self._analytics_flusher())
+        self._sweeper_task = asyncio.create_task(self._rate_limit_sweeper())
+
+    async def post_shutdown(self, _application: Application) -> None:
+        """Flush queued analytics before the application exits.
+
+        Also runs when startup fails before post_init, so only stop what started.
+        """
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+        if self._analytics_task is not None:
+            await self._analytics_queue.put(None)
+            await self._analytics_task
+
+    def log_analytics(self, user_id: str, action: str, metadata: dict = None) -> None:
+        """Queue an analytics event; rows are written in batches off the hot path.
+
+        created_at is filled by the bot_analytics column default at insert.
+        """
+        try:
+            self._analytics_queue.put_nowait(
+                {
+                    "user_id": user_id,
+                    "action": action,
+                    "metadata": metadata or {},
+                },
+            )
+        except asyncio.QueueFull:
+            logger.warning("Analytics queue full, dropping %s event", action)
+
+    async def _analytics_flusher(self) -> None:
+        """Drain queued analytics events into multi-row inserts until shutdown."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            event = await self._analytics_queue.get()
+            if event is None:
+                return
+            rows = [event]
+            deadline = loop.time() + ANALYTICS_FLUSH_INTERVAL
+            while len(rows) < ANALYTICS_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        self._analytics_queue.get(),
+                        timeout,
+                    )
+                except TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                rows.append(event)
+
+            try:
+                # supabase-py is synchronous; keep the insert off the event loop
+                await asyncio.to_thread(
+                    self.db.client.table("bot_analytics").insert(rows).execute,
+                )
+            except Exception as e:
+                # Don't let analytics errors break the bot, but leave a trace
+                logger.warning("Dropped %s analytics events: %s", len(rows), e)
+
+    async def _rate_limit_sweeper(self) -> None:
+        """Periodically forget idle rate-limit buckets so is_allowed stays O(1)."""
+        while True:
+            await asyncio.sleep(RATE_LIMIT_SWEEP_INTERVAL)
+            evicted = get_rate_limiter().evict_idle()
+            if evicted:
+                logger.debug("Evicted %s idle rate-limit buckets", evicted)
+
+    async def start(self, update: Update, _context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle /start command."""
+        user = update.effective_user
+        user_id = str(user.id)
 
-        # Update user session
-        await self.db.update_user_session(
-            user_id=str(user.id),
-            username=user.username,
-            first_name=user.first_name,
-            agent_type="pm",  # Default
+        # Reply and update user session concurrently
+        await asyncio.gather(
+            update.message.reply_text(
+                _WELCOME_TEMPLATE.format(first_name=user.first_name),
+                reply_markup=_START_KEYBOARD,
+                parse_mode=ParseMode.MARKDOWN,
+            ),
+            self.db.update_user_session(
+                user_id=user_id,
+                username=user.username,
+                first_name=user.first_name,
+                agent_type="pm",  # Default
+            ),
         )
 
         # Log analytics
-        await self.log_analytics(
-            user_id=str(user.id),
+        self.log_analytics(
+            user_id=user_id,
             action="bot_started",
             metadata={"username": user.username, "first_name": user.first_name},
         )
@@ -150,22 +373,15 @@ Choose your advisor to begin:
         await query.answer()
 
         user = update.effective_user
-        agent_type = query.data.replace("select_", "")
-
-        # Update user session
-        await self.db.update_user_session(
-            user_id=str(user.id),
-            username=user.username,
-            first_name=user.first_name,
-            agent_type=agent_type,
-        )
+        user_id = str(user.id)
+        agent_type = query.data.removeprefix(_SELECT_PREFIX)
 
         # Store in context for quick access
         context.user_data["agent_type"] = agent_type
 
         # Log analytics
-        await self.log_analytics(
-            user_id=str(user.id),
+        self.log_analytics(
+            user_id=user_id,
             action="agent_selected",
             metadata={
                 "agent_type": agent_type,
@@ -173,40 +389,18 @@ Choose your advisor to begin:
             },
         )
 
-        agent_name = AGENTS[agent_type]["name"]
-        agent_desc = AGENTS[agent_type]["description"]
-
-        start_prompts = {
-            "pm": [
-                "What problem are you solving?",
-                "Who is your target user?",
-                "What's your current product stage?",
-                "What are you struggling with?"
-            ],
-            "vc": [
-                "What's your business model?",
-                "How big is your market?",
-                "What's your competitive advantage?",
-                "What metrics are you tracking?"
-            ]
-        }
-
-        prompts = "\n- ".join(start_prompts[agent_type])
-
-        await query.edit_message_text(
-            f"""
-{agent_name} selected.
-
-I'll challenge your thinking and ask probing questions to help refine your strategy.
-
-Start by sharing:
-- {prompts}
-
-Or tell me about your startup.
-
-Switch advisors anytime with /pm or /vc
-""",
-            parse_mode=ParseMode.MARKDOWN
+        # Update user session and reply concurrently
+        await asyncio.gather(
+            self.db.update_user_session(
+                user_id=user_id,
+                username=user.username,
+                first_name=user.first_name,
+                agent_type=agent_type,
+            ),
+            query.edit_message_text(
+                _AGENT_INTRO[agent_type],
+                parse_mode=ParseMode.MARKDOWN,
+            ),
         )
 
     async def handle_message(
@@ -216,104 +410,119 @@ Switch advisors anytime with /pm or /vc
     ) -> None:
         """Handle regular text messages."""
         user = update.effective_user
+        user_id = str(user.id)
         message = update.message.text
 
         # Check rate limit
-        allowed, error_msg = rate_limiter.is_allowed(user.id)
+        allowed, error_msg = get_rate_limiter().is_allowed(user_id)
         if not allowed:
+            # Log rate limiting analytics (queued, no database round-trip)
+            self.log_analytics(
+                user_id=user_id,
+                action="rate_limited",
+                metadata={"error_msg": error_msg},
+            )
+
+            # Plain text: the notice has no Markdown to parse
             await update.message.reply_text(
                 f"⚠️ {error_msg}\n\nThis limit helps ensure quality service for all users.",
-                parse_mode=ParseMode.MARKDOWN,
-            )
-            
-            # Log rate limiting analytics
-            await self.log_analytics(
-                user_id=str(user.id),
-                action="rate_limited",
-                metadata={"error_msg": error_msg}
             )
             return
 
         # Get or set agent type
         agent_type = context.user_data.get("agent_type", "pm")
 
-        # Show typing indicator
-        await context.bot.send_chat_action(
-            chat_id=update.effective_chat.id,
-            action=ChatAction.TYPING,
+        # Show typing indicator without waiting on the round-trip
+        self._spawn(
+            context.bot.send_chat_action(
+                chat_id=update.effective_chat.id,
+                action=ChatAction.TYPING,
+            ),
         )
 
         try:
-            # Save user message
-            await self.db.save_message(
-                user_id=str(user.id),
-                username=user.username,
-                first_name=user.first_name,
-                agent_type=agent_type,
-                role="user",
-                message=message,
-            )
-
-            # Get conversation history
-            history = await self.db.get_conversation_history(
-                user_id=str(user.id),
-                agent_type=agent_type,
-                limit=10,
+            # Get conversation history (once, for both the summary and the
+            # prompt) and save the user message concurrently
+            history, saved = await asyncio.gather(
+                self.db.get_conversation_history(
+                    user_id=user_id,
+                    agent_type=agent_type,
+                    limit=20,
+                ),
+                self.db.save_message(
+                    user_id=user_id,
+                    username=user.username,
+                    first_name=user.first_name,
+                    agent_type=agent_type,
+                    role="user",
+                    message=message,
+                ),
             )
 
-            # Add conversation continuity for returning users
-            continuity_prefix = ""
-            if len(history) > 4:  # Has meaningful history
-                continuity_prefix = await self.get_conversation_summary(str(user.id), agent_type)
-
-            # Get AI response with continuity context
-            if continuity_prefix:
-                # Prepend continuity to user message for context
-                contextualized_message = f"[Continue from previous discussion: {continuity_prefix}]\n\nUser says: {message}"
-            else:
-                contextualized_message = message
+            # The read may or may not observe the concurrent insert; the
+            # current message is sent separately, so keep it out of history.
+            # Match the saved row's created_at too, so an identical earlier
+            # message whose reply was never saved stays in context.
+            latest = history[-1] if history else None
+            if (
+                latest
+                and latest["role"] == "user"
+                and latest["message"] == message
+                and latest.get("created_at") == saved.get("created_at")
+            ):
+                history = history[:-1]
+
+            # Add conversation continuity for returning users. It goes in the
+            # system prompt so the user message reaches the model unchanged.
+            system_suffix = ""
+            if len(history) >= 4:  # Has meaningful history
+                topics = _topics_from_history(history)
+                if topics:
+                    system_suffix = f"Continue from previous discussion: {topics}"
+
+            # Opening questions have no history, so the prompt depends only on
+            # the agent and the text and a recent answer can be reused
+            cache_key = None
+            if not history:
+                cache_key = (agent_type, normalize_text(message))
+            cached_response = self.response_cache.get(cache_key) if cache_key else None
 
             # Get AI response
-            ai_response, tokens = await self.ai.get_response(
-                agent_type=agent_type,
-                messages=history,
-                user_message=contextualized_message,
-            )
-
-            # Save AI response
-            await self.db.save_message(
-                user_id=str(user.id),
-                username=user.username,
-                first_name=user.first_name,
-                agent_type=agent_type,
-                role="assistant",
-                message=ai_response,
-                tokens_used=tokens,
+            if cached_response:
+                ai_response, tokens = cached_response, 0
+            else:
+                ai_response, tokens = await self.ai.get_response(
+                    agent_type=agent_type,
+                    messages=history[-MAX_HISTORY_MESSAGES:],
+                    user_message=message,
+                    system_suffix=system_suffix,
+                )
+                # Error replies report no token usage; only cache real answers
+                if cache_key and tokens:
+                    self.response_cache.set(cache_key, ai_response)
+
+            # Save AI response and send it to the user concurrently. A failed
+            # save is already logged by the database layer and the user has
+            # their answer, so only a failed send fails the turn.
+            _, sent = await asyncio.gather(
+                self.db.save_message(
+                    user_id=user_id,
+                    username=user.username,
+                    first_name=user.first_name,
+                    agent_type=agent_type,
+                    role="assistant",
+                    message=ai_response,
+                    tokens_used=tokens,
+                ),
+                self._send_response(update, ai_response),
+                return_exceptions=True,
             )
-
-            # Send response with MarkdownV2 + fallback
-            # Strip Mermaid code blocks proactively to avoid optional dependency warnings
-            ai_response_sanitized = re.sub(r"```mermaid[\s\S]*?```", "[Mermaid diagram omitted]", ai_response)
-
-            # Use strict MarkdownV2 escaping for final output (stable path)
-            safe = escape_md_v2(ai_response_sanitized)
-            parts = split_into_chunks(safe, limit=3900)
-            for part in parts:
-                try:
-                    await update.message.reply_text(
-                        part,
-                        parse_mode=ParseMode.MARKDOWN_V2,
-                        disable_web_page_preview=True,
-                    )
-                except Exception as e:
-                    logger.warning(f"MarkdownV2 parsing failed: {e}")
-                    # Plain-text fallback: remove escapes
-                    plain = part.replace("\\", "")
-                    await update.message.reply_text(plain, disable_web_page_preview=True)
+            if isinstance(sent, Exception):
+                raise sent
 
             # Log analytics
-            await self.log_analytics(
-                user_id=str(user.id),
+            self.log_analytics(
+                user_id=user_id,
                 action="message_processed",
                 metadata={
                     "agent_type": agent_type,
@@ -321,22 +530,42 @@ Switch advisors anytime with /pm or /vc
                     "response_length": len(ai_response),
                     "tokens_used": tokens,
                     "normalized_query": normalize_query(message),
+                    "cached_response": cached_response is not None,
                 },
             )
 
         except Exception as e:
-            logger.error(f"Error handling message: {e}")
+            logger.error("Error handling message: %s", e)
             await update.message.reply_text(
                 "Sorry, I encountered an error. Please try again.",
             )
 
             # Log error analytics
-            await self.log_analytics(
-                user_id=str(user.id),
+            self.log_analytics(
+                user_id=user_id,
                 action="message_error",
                 metadata={"agent_type": agent_type, "error": str(e)[:100]},
             )
 
+    async def _send_response(self, update: Update, ai_response: str) -> None:
+        """Send an AI response with MarkdownV2, falling back to plain text."""
+        # Strip Mermaid code blocks proactively to avoid optional dependency warnings
+        ai_response_sanitized = _MERMAID_RE.sub("[Mermaid diagram omitted]", ai_response)
+
+        # Use strict MarkdownV2 escaping for final output (stable path)
+        for part in prepare_reply(ai_response_sanitized):
+            try:
+                await update.message.reply_text(
+                    part,
+                    parse_mode=ParseMode.MARKDOWN_V2,
+                    disable_web_page_preview=True,
+                )
+            except Exception as e:
+                logger.warning("MarkdownV2 parsing failed: %s", e)
+                # Plain-text fallback: remove escapes
+                plain = part.replace("\\", "")
+                await update.message.reply_text(plain, disable_web_page_preview=True)
+
     async def switch_to_pm(
         self,
         update: Update,
@@ -361,20 +590,13 @@ Switch advisors anytime with /pm or /vc
     ) -> None:
         """Switch to a different agent."""
         user = update.effective_user
-
-        # Update session
-        await self.db.update_user_session(
-            user_id=str(user.id),
-            username=user.username,
-            first_name=user.first_name,
-            agent_type=agent_type,
-        )
+        user_id = str(user.id)
 
         context.user_data["agent_type"] = agent_type
 
         # Log analytics
-        await self.log_analytics(
-            user_id=str(user.id),
+        self.log_analytics(
+            user_id=user_id,
             action="agent_switched",
             metadata={
                 "new_agent_type": agent_type,
@@ -382,10 +604,18 @@ Switch advisors anytime with /pm or /vc
             },
         )
 
-        agent_name = AGENTS[agent_type]["name"]
-        await update.message.reply_text(
-            f"✅ Switched to **{agent_name}**\n\nHow can I help you?",
-            parse_mode=ParseMode.MARKDOWN,
+        # Update session and reply concurrently
+        await asyncio.gather(
+            self.db.update_user_session(
+                user_id=user_id,
+                username=user.username,
+                first_name=user.first_name,
+                agent_type=agent_type,
+            ),
+            update.message.reply_text(
+                _SWITCH_MESSAGES[agent_type],
+                parse_mode=ParseMode.MARKDOWN,
+            ),
         )
 
     async def reset(
@@ -395,20 +625,21 @@ Switch advisors anytime with /pm or /vc
     ) -> None:
         """Handle /reset command."""
         user = update.effective_user
+        user_id = str(user.id)
         agent_type = context.user_data.get("agent_type", "pm")
 
         # Clear conversation history for current agent
-        await self.db.clear_conversation(user_id=str(user.id), agent_type=agent_type)
+        await self.db.clear_conversation(user_id=user_id, agent_type=agent_type)
 
         agent_name = AGENTS[agent_type]["name"]
         await update.message.reply_text(
-            f"🔄 **Conversation Reset!**\n\nYour conversation history with {agent_name} has been cleared.\n\nLet's start fresh! What would you like to discuss?",
+            _RESET_MESSAGES[agent_type],
             parse_mode=ParseMode.MARKDOWN,
         )
 
         # Log analytics
-        await self.log_analytics(
-            user_id=str(user.id),
+        self.log_analytics(
+            user_id=user_id,
             action="conversation_reset",
             metadata={"agent_type": agent_type, "agent_name": agent_name},
         )
@@ -420,15 +651,15 @@ Switch advisors anytime with /pm or /vc
     ) -> None:
         """Handle /stats command."""
         user = update.effective_user
+        user_id = str(user.id)
 
         # Get user stats
-        stats = await self.db.get_user_stats(str(user.id))
+        stats = await self.db.get_user_stats(user_id)
 
         # Format dates
         if stats["first_message_date"]:
-            first_date = datetime.fromisoformat(
-                stats["first_message_date"].replace("Z", "+00:00")
-            )
+            # Python 3.11+ parses the "Z" suffix as UTC directly
+            first_date = datetime.fromisoformat(stats["first_message_date"])
             # Ensure both datetimes are timezone-aware for proper comparison
             days_active = (datetime.now(UTC) - first_date).days
             member_since = first_date.strftime("%B %d, %Y")
@@ -436,22 +667,22 @@ Switch advisors anytime with /pm or /vc
             days_active = 0
             member_since = "Today"
 
-        stats_message = f"""
-**Your Statistics**
-
-**User:** {user.first_name or 'Founder'}
-**Member Since:** {member_since}
-**Days Active:** {days_active}
-
-**Total Messages:** {stats['total_messages']}
-- Product Manager: {stats['pm_messages']}
-- VC/Angel: {stats['vc_messages']}
-
-**Favorite Advisor:** {'Product Manager' if stats['pm_messages'] > stats['vc_messages'] else 'VC/Angel' if stats['vc_messages'] > stats['pm_messages'] else 'Tie!'}
-
----
-Beta version - Feedback to @espejelomar
-"""
+        if stats["pm_messages"] > stats["vc_messages"]:
+            favorite = "Product Manager"
+        elif stats["vc_messages"] > stats["pm_messages"]:
+            favorite = "VC/Angel"
+        else:
+            favorite = "Tie!"
+
+        stats_message = _STATS_TEMPLATE.format(
+            first_name=user.first_name or "Founder",
+            member_since=member_since,
+            days_active=days_active,
+            total_messages=stats["total_messages"],
+            pm_messages=stats["pm_messages"],
+            vc_messages=stats["vc_messages"],
+            favorite=favorite,
+        )
 
         await update.message.reply_text(
             stats_message,
@@ -459,8 +690,8 @@ Beta version - Feedback to @espejelomar
         )
 
         # Log analytics
-        await self.log_analytics(
-            user_id=str(user.id),
+        self.log_analytics(
+            user_id=user_id,
             action="stats_viewed",
             metadata={
                 "total_messages": stats["total_messages"],
@@ -476,31 +707,7 @@ Beta version - Feedback to @espejelomar
         _context: ContextTypes.DEFAULT_TYPE,
     ) -> None:
         """Handle /help command."""
-        help_text = """
-**How to use this bot:**
-
-**Commands:**
-- /start - Choose your advisor
-- /pm - Switch to Product Manager
-- /vc - Switch to VC/Angel Investor  
-- /reset - Clear conversation history
-- /stats - View your usage stats
-- /help - Show this help message
-
-**Tips:**
-- Be specific about your startup/product
-- Ask follow-up questions
-- Share your challenges openly
-- The AI has internet access for current data
-
-**Beta Version**
-This bot is in beta. Your feedback helps improve it.
-Report bugs or suggestions to @espejelomar
-
-Current advisor: Check bot responses to see which mode is active.
-"""
-
         await update.message.reply_text(
-            help_text,
+            _HELP_TEXT,
             parse_mode=ParseMode.MARKDOWN,
         )
@@ -6,6 +6,7 @@ import sys
 
 from telegram import Update
 from telegram.ext import (
+    AIORateLimiter,
     Application,
     CallbackQueryHandler,
     CommandHandler,
@@ -13,9 +14,17 @@ from telegram.ext import (
     filters,
 )
 
-from .config import TELEGRAM_BOT_TOKEN
+from .config import (
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CONCURRENT_UPDATES,
+    TELEGRAM_CONNECT_TIMEOUT,
+    TELEGRAM_CONNECTION_POOL_SIZE,
+    TELEGRAM_POOL_TIMEOUT,
+    TELEGRAM_READ_TIMEOUT,
+    TELEGRAM_WRITE_TIMEOUT,
+)
 from .handlers import BotHandlers
-from .middleware import error_handler
+from .middleware import PerUserUpdateProcessor, error_handler
 
 # Enable logging
 logging.basicConfig(
@@ -24,41 +33,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Plain text messages that aren't commands go to the active agent
+_TEXT_FILTER = filters.TEXT & ~filters.COMMAND
+
+# Only fetch the update types the registered handlers consume
+_ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+
+def _register_handlers(application: Application, handlers: BotHandlers) -> None:
+    """Register every command, callback and message handler plus the error handler."""
+    application.add_handlers(
+        [
+            # Commands
+            CommandHandler("start", handlers.start),
+            CommandHandler("pm", handlers.switch_to_pm),
+            CommandHandler("vc", handlers.switch_to_vc),
+            CommandHandler("reset", handlers.reset),
+            CommandHandler("stats", handlers.stats),
+            CommandHandler("help", handlers.help_command),
+            # Inline keyboard agent selection
+            CallbackQueryHandler(
+                handlers.handle_agent_selection,
+                pattern="^select_",
+            ),
+            # Regular text messages
+            MessageHandler(
+                _TEXT_FILTER,
+                handlers.handle_message,
+            ),
+        ],
+    )
+    application.add_error_handler(error_handler)
+
 
 def main() -> None:
     """Start the bot."""
-    # Create application
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
-
     # Initialize handlers
     handlers = BotHandlers()
 
-    # Register command handlers
-    application.add_handler(CommandHandler("start", handlers.start))
-    application.add_handler(CommandHandler("pm", handlers.switch_to_pm))
-    application.add_handler(CommandHandler("vc", handlers.switch_to_vc))
-    application.add_handler(CommandHandler("reset", handlers.reset))
-    application.add_handler(CommandHandler("stats", handlers.stats))
-    application.add_handler(CommandHandler("help", handlers.help_command))
-
-    # Register callback query handler for inline keyboards
-    application.add_handler(
-        CallbackQueryHandler(
-            handlers.handle_agent_selection,
-            pattern="^select_",
-        )
-    )
-
-    # Register message handler for regular text
-    application.add_handler(
-        MessageHandler(
-            filters.TEXT & ~filters.COMMAND,
-            handlers.handle_message,
-        )
+    # Create application
+    application = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .connection_pool_size(TELEGRAM_CONNECTION_POOL_SIZE)
+        .pool_timeout(TELEGRAM_POOL_TIMEOUT)
+        .connect_timeout(TELEGRAM_CONNECT_TIMEOUT)
+        .read_timeout(TELEGRAM_READ_TIMEOUT)
+        .write_timeout(TELEGRAM_WRITE_TIMEOUT)
+        # A slow LLM reply for one user must not hold up everyone else's
+        # updates; each user's own updates still run in order
+        .concurrent_updates(PerUserUpdateProcessor(TELEGRAM_CONCURRENT_UPDATES))
+        # Stay under Telegram's bot-wide 30 msg/s limit instead of hitting 429s
+        .rate_limiter(AIORateLimiter())
+        .post_init(handlers.post_init)
+        .post_shutdown(handlers.post_shutdown)
+        .build()
     )
 
-    # Add error handler
-    application.add_error_handler(error_handler)
+    # Register handlers
+    _register_handlers(application, handlers)
 
     # Add graceful shutdown
     def signal_handler(signum, frame):
@@ -71,7 +104,7 @@ def main() -> None:
 
     # Start the bot
     logger.info("Starting bot...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    application.run_polling(allowed_updates=_ALLOWED_UPDATES)
 
 
 if __name__ == "__main__":
@@ -81,5 +114,5 @@ if __name__ == "__main__":
         logger.info("Bot stopped by user")
         sys.exit(0)
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         sys.exit(1)
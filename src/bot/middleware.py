@@ -1,18 +1,81 @@
 """Middleware for error handling and logging."""
 
+import asyncio
 import logging
+import sys
+from collections.abc import Awaitable
+from typing import Any
+
 from telegram import Update
-from telegram.ext import ContextTypes
+from telegram.ext import BaseUpdateProcessor, ContextTypes
 
 logger = logging.getLogger(__name__)
 
 
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Process updates concurrently across users but one at a time per user.
+
+    Keeps a user's messages, /reset and agent switches from overlapping, so
+    history reads, LLM calls and replies happen in the order they were sent.
+    """
+
+    __slots__ = ("_pending", "_slots", "_user_locks")
+
+    def __init__(self, max_concurrent_updates: int) -> None:
+        if max_concurrent_updates < 1:
+            raise ValueError("`max_concurrent_updates` must be a positive integer!")
+        # PTB's own semaphore is taken before do_process_update, so an update
+        # queued behind its user's lock would hold a slot. Leave that one
+        # unbounded and take our slot only once it's this update's turn.
+        super().__init__(sys.maxsize)
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._user_locks: dict[int, asyncio.Lock] = {}
+        # Updates holding or waiting on each lock; the lock is dropped at zero
+        self._pending: dict[int, int] = {}
+
+    async def do_process_update(
+        self,
+        update: object,
+        coroutine: Awaitable[Any],
+    ) -> None:
+        """Await the update's handlers once the user's earlier updates finish."""
+        user = update.effective_user if isinstance(update, Update) else None
+        if user is None:
+            async with self._slots:
+                await coroutine
+            return
+
+        user_id = user.id
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks[user_id] = asyncio.Lock()
+        self._pending[user_id] = self._pending.get(user_id, 0) + 1
+        try:
+            async with lock, self._slots:
+                await coroutine
+        finally:
+            self._pending[user_id] -= 1
+            if not self._pending[user_id]:
+                del self._pending[user_id]
+                del self._user_locks[user_id]
+
+    async def initialize(self) -> None:
+        """Nothing to set up; locks are created per user on demand."""
+
+    async def shutdown(self) -> None:
+        """Nothing to tear down."""
+
+
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log errors and notify user."""
-    logger.error(f"Exception while handling an update: {context.error}")
+    logger.error("Exception while handling an update: %s", context.error)
 
     if update and update.effective_message:
-        await update.effective_message.reply_text(
-            "Sorry, something went wrong. Please try again or use /help.\n\n"
-            "If this persists, please report to @espejelomar"
+        # Notify in the background so a slow Telegram API doesn't hold up the
+        # handler. No update is attached, so a failed notice is only logged.
+        context.application.create_task(
+            update.effective_message.reply_text(
+                "Sorry, something went wrong. Please try again or use /help.\n\n"
+                "If this persists, please report to @espejelomar",
+            ),
         )
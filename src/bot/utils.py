@@ -1,99 +1,184 @@
 """Utility functions for the bot."""
 
-from datetime import datetime, timedelta
-from typing import Dict, List
+from collections import OrderedDict
+from collections.abc import Hashable
+from functools import lru_cache
 import re
 import logging
+import math
+import time
 
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
-    """Simple in-memory rate limiter."""
+    """Simple in-memory token-bucket rate limiter.
 
-    def __init__(self, max_requests: int = 30, window_minutes: int = 60):
+    Each user may burst up to ``max_requests`` messages; tokens refill
+    continuously at ``max_requests`` per window.
+    """
+
+    def __init__(self, max_requests: int = 30, window_minutes: int = 60) -> None:
         self.max_requests = max_requests
-        self.window = timedelta(minutes=window_minutes)
-        self.requests: Dict[str, List[datetime]] = {}
+        self.window_seconds = window_minutes * 60
+        self.refill_rate = max_requests / self.window_seconds  # tokens/second
+        # user_id -> (tokens, monotonic time of last refill)
+        self.buckets: dict[str, tuple[float, float]] = {}
 
     def is_allowed(self, user_id: str) -> tuple[bool, str]:
         """Check if user is within rate limits."""
-        now = datetime.now()
+        now = time.monotonic()
         user_id = str(user_id)
 
-        # Clean old requests
-        if user_id in self.requests:
-            self.requests[user_id] = [
-                req_time
-                for req_time in self.requests[user_id]
-                if now - req_time < self.window
-            ]
-        else:
-            self.requests[user_id] = []
+        # Refill for the time elapsed since the last request
+        tokens, last = self.buckets.get(user_id, (self.max_requests, now))
+        tokens = min(self.max_requests, tokens + (now - last) * self.refill_rate)
 
         # Check limit
-        request_count = len(self.requests[user_id])
-        if request_count >= self.max_requests:
-            wait_time = self.window - (now - self.requests[user_id][0])
-            minutes = int(wait_time.total_seconds() / 60)
+        if tokens < 1:
+            self.buckets[user_id] = (tokens, now)
+            wait_seconds = (1 - tokens) / self.refill_rate
+            minutes = max(1, math.ceil(wait_seconds / 60))
             return False, f"Rate limit reached. Please wait {minutes} minutes."
 
         # Allow request
-        self.requests[user_id].append(now)
+        self.buckets[user_id] = (tokens - 1, now)
         return True, ""
 
+    def evict_idle(self) -> int:
+        """Drop buckets idle for a full window and return how many were dropped.
+
+        Such buckets have refilled completely, so forgetting them is
+        indistinguishable from keeping them.
+        """
+        cutoff = time.monotonic() - self.window_seconds
+        idle = [uid for uid, (_, last) in self.buckets.items() if last <= cutoff]
+        for uid in idle:
+            del self.buckets[uid]
+        return len(idle)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Return the shared rate limiter, creating it on first use."""
+    return RateLimiter(max_requests=30, window_minutes=60)
+
+
+class ResponseCache:
+    """Simple in-memory LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 300) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.entries: OrderedDict[Hashable, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: Hashable) -> str | None:
+        """Return the cached value, or None if missing or expired."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at >= self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: str) -> None:
+        """Store a value, evicting the least recently used entries."""
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
 
-# Global rate limiter instance
-rate_limiter = RateLimiter(max_requests=30, window_minutes=60)
 
+def normalize_text(text: str | None) -> str:
+    """Trim, lowercase and collapse whitespace so equivalent texts compare equal."""
+    if not text:
+        return ""
+    return _WHITESPACE_RE.sub(" ", text.strip().lower())
 
+
+@lru_cache(maxsize=2048)
 def normalize_query(text: str | None) -> str:
     """Normalize a user query for analytics grouping and reduced PII.
 
     - Trim and lowercase
     - Collapse whitespace
     - Truncate to 300 chars
+
+    Results are memoized since users often repeat short queries.
     """
-    if not text:
-        return ""
-    normalized = text.strip().lower()
-    normalized = re.sub(r"\s+", " ", normalized)
-    return normalized[:300]
+    return normalize_text(text)[:300]
+
+
+# MarkdownV2 special characters, plus the backslash itself
+_MD_V2_SPECIALS = "\\_*[]()~`>#+-=|{}.!"
+_MD_V2_ESCAPES = str.maketrans({ch: "\\" + ch for ch in _MD_V2_SPECIALS})
+_MD_V2_SPECIAL_RE = re.compile("[" + re.escape(_MD_V2_SPECIALS) + "]")
 
 
 def escape_md_v2(text: str) -> str:
     """Deprecated: kept for compatibility; prefer telegramify for final rendering."""
     if text is None:
         return ""
-    escaped = text.replace("\\", "\\\\")
-    specials = r"_*[]()~`>#+-=|{}.!"
-    out = []
-    for ch in escaped:
-        out.append("\\" + ch if ch in specials else ch)
-    return "".join(out)
+    # Plain text needs no escaping; skip building a copy
+    if not _MD_V2_SPECIAL_RE.search(text):
+        return text
+    return text.translate(_MD_V2_ESCAPES)
 
 
-def split_into_chunks(text: str, limit: int = 3900) -> list[str]:
+def split_into_chunks(text: str, limit: int = 4000) -> list[str]:
     """Split text into chunks under Telegram's 4096 char limit.
 
-    Attempts to split on newline boundaries, falling back to hard split.
+    Prefers paragraph breaks, then newlines, then spaces, falling back to a
+    hard split. Hard splits never leave a dangling MarkdownV2 escape backslash.
+    Works with offsets into ``text`` so each chunk is sliced exactly once.
     """
     chunks: list[str] = []
-    remaining = text
-    while remaining:
-        if len(remaining) <= limit:
-            chunks.append(remaining)
-            break
-        # Try to split at last newline within limit
-        split_at = remaining.rfind("\n", 0, limit)
-        if split_at == -1 or split_at < limit * 0.5:
-            split_at = limit
-        chunk = remaining[:split_at]
-        chunks.append(chunk)
-        remaining = remaining[split_at:].lstrip("\n")
+    n = len(text)
+    pos = 0
+    while n - pos > limit:
+        end = pos + limit
+        # Only accept a boundary in the back half to avoid tiny chunks
+        floor = pos + limit // 2
+        for sep in ("\n\n", "\n", " "):
+            split_at = text.rfind(sep, floor, end)
+            if split_at != -1:
+                # Drop a separating space; newlines are skipped below
+                next_pos = split_at + 1 if sep == " " else split_at
+                break
+        else:
+            split_at = end
+            # Don't separate a MarkdownV2 escape from the character it escapes
+            trailing = 0
+            while trailing < limit and text[split_at - trailing - 1] == "\\":
+                trailing += 1
+            if trailing % 2:
+                split_at -= 1
+            next_pos = split_at
+        chunks.append(text[pos:split_at])
+        pos = next_pos
+        while pos < n and text[pos] == "\n":
+            pos += 1
+    if pos < n:
+        chunks.append(text[pos:])
     return chunks
 
 
+@lru_cache(maxsize=64)
+def prepare_reply(text: str) -> tuple[str, ...]:
+    """Escape text for MarkdownV2 and split it into sendable chunks.
+
+    Memoized so repeated replies (cached answers, error messages) are
+    escaped and split only once.
+    """
+    return tuple(split_into_chunks(escape_md_v2(text)))
+
+
 def mdv2_bold(text: str) -> str:
     """Deprecated: avoid manual composition; use telegramify in the final send path."""
     return f"*{escape_md_v2(text)}*"
@@ -1,7 +1,22 @@
 """Tests for database operations."""
+import asyncio
+import time
 import pytest
 from unittest.mock import Mock, patch
-from src.bot.database import Database
+from src.bot.database import SESSION_UPDATE_INTERVAL, Database
+
+
+@pytest.fixture
+def db_and_query():
+    """Database on a mocked client, plus the history query's final builder."""
+    with patch('src.bot.database.create_client') as mock_create_client:
+        mock_client = Mock()
+        mock_create_client.return_value = mock_client
+        query = mock_client.table.return_value.select.return_value
+        query = query.eq.return_value.eq.return_value.order.return_value
+        query = query.limit.return_value
+        query.execute.return_value = Mock(data=[])
+        yield Database(), query
 
 
 class TestDatabase:
@@ -28,4 +43,94 @@ class TestDatabase:
     async def test_get_conversation_history_success(self):
         """Test successful conversation history retrieval."""
         # This will be implemented when we have actual Supabase setup
-        pass
\ No newline at end of file
+        pass
+
+    @pytest.mark.asyncio
+    async def test_conversation_history_is_cached(self, db_and_query):
+        """Test repeat history reads are served from the in-process cache."""
+        db, query = db_and_query
+        query.execute.return_value = Mock(
+            data=[{"role": "assistant", "message": "b"}, {"role": "user", "message": "a"}]
+        )
+
+        first = await db.get_conversation_history("1", "pm")
+        second = await db.get_conversation_history("1", "pm")
+
+        assert first == second == [
+            {"role": "user", "message": "a"},
+            {"role": "assistant", "message": "b"},
+        ]
+        assert query.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_history_cache_tracks_writes(self, db_and_query):
+        """Test saved messages are appended and clears evict the cache."""
+        db, _ = db_and_query
+        db.client.table.return_value.insert.return_value.execute.return_value = Mock(
+            data=[{"role": "user", "message": "hi"}]
+        )
+
+        await db.get_conversation_history("1", "pm")
+        await db.save_message("1", None, None, "pm", "user", "hi")
+
+        assert await db.get_conversation_history("1", "pm") == [
+            {"role": "user", "message": "hi"}
+        ]
+
+        await db.clear_conversation("1", "pm")
+        assert ("1", "pm") not in db._history_cache
+
+    @pytest.mark.asyncio
+    async def test_concurrent_save_is_not_lost_from_cache(self, db_and_query):
+        """Test a save racing a cold history read still lands in the cache."""
+        db, _ = db_and_query
+        db.client.table.return_value.insert.return_value.execute.return_value = Mock(
+            data=[{"role": "user", "message": "hi"}]
+        )
+
+        history, _ = await asyncio.gather(
+            db.get_conversation_history("1", "pm"),
+            db.save_message("1", None, None, "pm", "user", "hi"),
+        )
+
+        assert history == []
+        assert await db.get_conversation_history("1", "pm") == [
+            {"role": "user", "message": "hi"}
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("agent_type", ["pm", None])
+    async def test_clear_racing_cold_read_leaves_cache_empty(
+        self, db_and_query, agent_type
+    ):
+        """Test a slow history read can't re-cache rows a clear just deleted."""
+        db, query = db_and_query
+
+        def slow_select():
+            time.sleep(0.05)
+            return Mock(data=[{"role": "user", "message": "old"}])
+
+        query.execute.side_effect = slow_select
+
+        async def clear_mid_read():
+            await asyncio.sleep(0.01)
+            await db.clear_conversation("1", agent_type)
+
+        await asyncio.gather(
+            db.get_conversation_history("1", "pm"),
+            clear_mid_read(),
+        )
+
+        assert ("1", "pm") not in db._history_cache
+
+    @pytest.mark.asyncio
+    async def test_stale_session_debounce_entries_are_pruned(self, db_and_query):
+        """Test debounce state only keeps users updated within the interval."""
+        db, _ = db_and_query
+        await db.update_user_session("1", None, None, "pm")
+        updated, agent_type = db._last_session_update["1"]
+        db._last_session_update["1"] = (updated - SESSION_UPDATE_INTERVAL, agent_type)
+
+        await db.update_user_session("2", None, None, "pm")
+
+        assert list(db._last_session_update) == ["2"]
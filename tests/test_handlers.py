@@ -0,0 +1,175 @@
+"""Tests for bot handlers."""
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+# config validates these at import time
+for _var in (
+    "TELEGRAM_BOT_TOKEN",
+    "OPENROUTER_API_KEY",
+    "SUPABASE_URL",
+    "SUPABASE_SERVICE_KEY",
+):
+    os.environ.setdefault(_var, "test")
+
+from src.bot.handlers import BotHandlers  # noqa: E402
+from src.bot.utils import RateLimiter  # noqa: E402
+
+
+@pytest.fixture
+def handlers():
+    """BotHandlers wired to mocked database and AI clients."""
+    db = Mock()
+    db.get_conversation_history = AsyncMock(return_value=[])
+    db.save_message = AsyncMock(return_value={})
+    db.update_user_session = AsyncMock()
+    ai = Mock()
+    ai.get_response = AsyncMock(return_value=("answer", 10))
+    with (
+        patch("src.bot.handlers._get_db", return_value=db),
+        patch("src.bot.handlers._get_ai", return_value=ai),
+    ):
+        yield BotHandlers()
+
+
+def inserted_actions(handlers):
+    """Actions of the rows passed to each bot_analytics insert, in call order."""
+    insert = handlers.db.client.table.return_value.insert
+    return [[row["action"] for row in call.args[0]] for call in insert.call_args_list]
+
+
+class TestAnalyticsFlusher:
+    """Test cases for batched analytics writes."""
+
+    @pytest.mark.asyncio
+    async def test_events_within_interval_share_one_insert(self, handlers):
+        """Test events logged close together are written as one multi-row insert."""
+        with patch("src.bot.handlers.ANALYTICS_FLUSH_INTERVAL", 0.05):
+            await handlers.post_init(Mock())
+            for action in ("a", "b", "c"):
+                handlers.log_analytics("1", action)
+            await asyncio.sleep(0.2)
+
+            assert inserted_actions(handlers) == [
+                ["a", "b", "c"],
+            ]
+            await handlers.post_shutdown(Mock())
+
+    @pytest.mark.asyncio
+    async def test_shutdown_flushes_partial_batch(self, handlers):
+        """Test post_shutdown writes events still waiting for their batch to fill."""
+        await handlers.post_init(Mock())
+        handlers.log_analytics("1", "a")
+        handlers.log_analytics("1", "b")
+
+        await handlers.post_shutdown(Mock())
+
+        assert inserted_actions(handlers) == [
+            ["a", "b"],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_without_init_is_noop(self, handlers):
+        """Test post_shutdown is safe when post_init never ran."""
+        await handlers.post_shutdown(Mock())
+
+        assert handlers._analytics_queue.empty()
+        assert inserted_actions(handlers) == []
+
+    def test_full_queue_drops_new_events(self):
+        """Test events beyond the queue bound are dropped, not raised."""
+        with (
+            patch("src.bot.handlers.ANALYTICS_QUEUE_SIZE", 1),
+            patch("src.bot.handlers._get_db"),
+            patch("src.bot.handlers._get_ai"),
+        ):
+            handlers = BotHandlers()
+        handlers.log_analytics("1", "kept")
+        handlers.log_analytics("1", "dropped")
+
+        assert handlers._analytics_queue.qsize() == 1
+        assert handlers._analytics_queue.get_nowait()["action"] == "kept"
+
+
+def make_update(text, user_id=1):
+    """Build a mock text message update."""
+    update = Mock()
+    update.effective_user.id = user_id
+    update.message.text = text
+    update.message.reply_text = AsyncMock()
+    return update
+
+
+def make_context(agent_type="pm"):
+    """Build a mock handler context with the agent already chosen."""
+    context = Mock()
+    context.user_data = {"agent_type": agent_type}
+    context.bot.send_chat_action = AsyncMock()
+    return context
+
+
+class TestHandleMessage:
+    """Test cases for handle_message."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_rate_limiter(self):
+        """Give each test its own rate-limit state."""
+        with patch("src.bot.handlers.get_rate_limiter", return_value=RateLimiter()):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_current_message_is_stripped_from_history(self, handlers):
+        """Test a history read that saw the concurrent insert drops that row."""
+        earlier = [
+            {"role": "user", "message": "hi", "created_at": "t1"},
+            {"role": "assistant", "message": "hello", "created_at": "t2"},
+        ]
+        current = {"role": "user", "message": "next", "created_at": "t3"}
+        handlers.db.get_conversation_history.return_value = [*earlier, current]
+        handlers.db.save_message.return_value = current
+
+        await handlers.handle_message(make_update("next"), make_context())
+
+        kwargs = handlers.ai.get_response.await_args.kwargs
+        assert kwargs["messages"] == earlier
+        assert kwargs["user_message"] == "next"
+
+    @pytest.mark.asyncio
+    async def test_history_without_current_message_is_kept(self, handlers):
+        """Test history is passed through, including an identical earlier message."""
+        earlier = [
+            {"role": "assistant", "message": "hello", "created_at": "t1"},
+            {"role": "user", "message": "next", "created_at": "t2"},
+        ]
+        handlers.db.get_conversation_history.return_value = earlier
+        handlers.db.save_message.return_value = {
+            "role": "user",
+            "message": "next",
+            "created_at": "t3",
+        }
+
+        await handlers.handle_message(make_update("next"), make_context())
+
+        assert handlers.ai.get_response.await_args.kwargs["messages"] == earlier
+
+    @pytest.mark.asyncio
+    async def test_identical_openers_share_cached_answer(self, handlers):
+        """Test a repeated opening question is answered from the cache."""
+        await handlers.handle_message(make_update("What is Starknet?"), make_context())
+        update = make_update("  what is   starknet? ", user_id=2)
+        await handlers.handle_message(update, make_context())
+
+        handlers.ai.get_response.assert_awaited_once()
+        update.message.reply_text.assert_awaited_once()
+        assert update.message.reply_text.await_args.args[0] == "answer"
+
+    @pytest.mark.asyncio
+    async def test_error_replies_are_not_cached(self, handlers):
+        """Test replies without token usage are fetched again next time."""
+        handlers.ai.get_response.return_value = ("Sorry, try again.", 0)
+
+        await handlers.handle_message(make_update("hi"), make_context())
+        await handlers.handle_message(make_update("hi", user_id=2), make_context())
+
+        assert handlers.ai.get_response.await_count == 2
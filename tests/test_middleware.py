@@ -0,0 +1,75 @@
+"""Tests for update processing middleware."""
+import asyncio
+import pytest
+from unittest.mock import Mock
+from telegram import Update
+from src.bot.middleware import PerUserUpdateProcessor
+
+
+def make_update(user_id):
+    """Build a mock update from the given user."""
+    update = Mock(spec=Update)
+    update.effective_user.id = user_id
+    return update
+
+
+class TestPerUserUpdateProcessor:
+    """Test cases for PerUserUpdateProcessor."""
+
+    @pytest.mark.asyncio
+    async def test_same_user_updates_run_in_order(self):
+        """Test a user's second update waits for the first to finish."""
+        processor = PerUserUpdateProcessor(8)
+        events = []
+
+        async def handle(name, delay):
+            events.append(f"{name} start")
+            await asyncio.sleep(delay)
+            events.append(f"{name} end")
+
+        await asyncio.gather(
+            processor.process_update(make_update(1), handle("a", 0.02)),
+            processor.process_update(make_update(1), handle("b", 0)),
+        )
+
+        assert events == ["a start", "a end", "b start", "b end"]
+        assert not processor._user_locks
+
+    @pytest.mark.asyncio
+    async def test_different_users_run_concurrently(self):
+        """Test one user's slow update doesn't block another user."""
+        processor = PerUserUpdateProcessor(8)
+        events = []
+
+        async def handle(name, delay):
+            events.append(f"{name} start")
+            await asyncio.sleep(delay)
+            events.append(f"{name} end")
+
+        await asyncio.gather(
+            processor.process_update(make_update(1), handle("a", 0.02)),
+            processor.process_update(make_update(2), handle("b", 0)),
+        )
+
+        assert events == ["a start", "b start", "b end", "a end"]
+
+    @pytest.mark.asyncio
+    async def test_queued_backlog_does_not_hold_slots(self):
+        """Test updates waiting on their user's lock leave slots for others."""
+        processor = PerUserUpdateProcessor(2)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        finished = {}
+
+        async def handle(name, delay):
+            await asyncio.sleep(delay)
+            finished[name] = loop.time() - start
+
+        await asyncio.gather(
+            processor.process_update(make_update(1), handle("a1", 0.1)),
+            processor.process_update(make_update(1), handle("a2", 0.1)),
+            processor.process_update(make_update(2), handle("b", 0)),
+        )
+
+        assert finished["b"] < 0.05
+        assert finished["a2"] >= 0.2
@@ -0,0 +1,168 @@
+"""Tests for utility functions."""
+from src.bot.utils import (
+    RateLimiter,
+    ResponseCache,
+    escape_md_v2,
+    normalize_query,
+    normalize_text,
+    prepare_reply,
+    split_into_chunks,
+)
+
+
+class TestEscapeMdV2:
+    """Test cases for escape_md_v2."""
+
+    def test_escapes_special_characters(self):
+        """Test MarkdownV2 special characters get a backslash."""
+        assert escape_md_v2("a_b*c.d!") == "a\\_b\\*c\\.d\\!"
+
+    def test_escapes_backslash_once(self):
+        """Test existing backslashes are escaped without double processing."""
+        assert escape_md_v2("\\.") == "\\\\\\."
+
+    def test_every_special_character_is_escaped_alone(self):
+        """Test the plain-text fast path never skips a special character."""
+        for ch in "\\_*[]()~`>#+-=|{}.!":
+            assert escape_md_v2(ch) == "\\" + ch
+
+    def test_plain_text_is_unchanged(self):
+        """Test text without special characters is returned as-is."""
+        assert escape_md_v2("hello world") == "hello world"
+
+    def test_none_is_empty(self):
+        """Test None input returns an empty string."""
+        assert escape_md_v2(None) == ""
+
+
+class TestNormalize:
+    """Test cases for normalize_text and normalize_query."""
+
+    def test_normalize_text_collapses_case_and_whitespace(self):
+        """Test equivalent texts normalize to the same key."""
+        assert normalize_text("  Hello \n  World ") == "hello world"
+        assert normalize_text(None) == ""
+
+    def test_normalize_query_truncates(self):
+        """Test analytics queries are capped at 300 chars."""
+        assert normalize_query("a" * 400) == "a" * 300
+
+
+class TestSplitIntoChunks:
+    """Test cases for split_into_chunks."""
+
+    def test_short_text_is_single_chunk(self):
+        """Test text under the limit is returned as-is."""
+        assert split_into_chunks("hello", limit=10) == ["hello"]
+
+    def test_prefers_newline_boundaries(self):
+        """Test splitting happens at the last newline within the limit."""
+        assert split_into_chunks("aaaaaa\nbbbbbb", limit=10) == ["aaaaaa", "bbbbbb"]
+
+    def test_prefers_paragraph_over_line_breaks(self):
+        """Test a blank line wins over a later single newline."""
+        text = "aaaaa\n\nbb\ncccccc"
+        assert split_into_chunks(text, limit=11) == ["aaaaa", "bb\ncccccc"]
+
+    def test_falls_back_to_spaces(self):
+        """Test text without newlines splits between words."""
+        assert split_into_chunks("aaaaaa bbbbbb", limit=10) == ["aaaaaa", "bbbbbb"]
+
+    def test_hard_split_keeps_escapes_intact(self):
+        """Test a hard split never ends a chunk with a lone escape backslash."""
+        text = escape_md_v2("abc." * 10)
+        chunks = split_into_chunks(text, limit=8)
+
+        assert "".join(chunks) == text
+        for chunk in chunks:
+            trailing = len(chunk) - len(chunk.rstrip("\\"))
+            assert trailing % 2 == 0
+
+
+class TestPrepareReply:
+    """Test cases for prepare_reply."""
+
+    def test_escapes_then_splits(self):
+        """Test the reply is escaped before being chunked."""
+        assert prepare_reply("a.b") == ("a\\.b",)
+
+    def test_repeated_text_is_memoized(self):
+        """Test the same text returns the cached chunks."""
+        assert prepare_reply("hello.") is prepare_reply("hello.")
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def test_get_returns_stored_value(self):
+        """Test a stored value is returned until it expires."""
+        cache = ResponseCache(ttl_seconds=60)
+        cache.set(("pm", "hi"), "hello")
+
+        assert cache.get(("pm", "hi")) == "hello"
+        assert cache.get(("vc", "hi")) is None
+
+    def test_expired_entries_are_dropped(self):
+        """Test entries older than the TTL are treated as missing."""
+        cache = ResponseCache(ttl_seconds=0)
+        cache.set("key", "value")
+
+        assert cache.get("key") is None
+        assert "key" not in cache.entries
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache stays within max_entries."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert list(cache.entries) == ["a", "c"]
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+
+    def test_allows_burst_up_to_limit(self):
+        """Test a user can send max_requests messages before being limited."""
+        limiter = RateLimiter(max_requests=3, window_minutes=60)
+
+        assert [limiter.is_allowed(1)[0] for _ in range(4)] == [True, True, True, False]
+
+    def test_limited_user_gets_wait_message(self):
+        """Test the denial message tells the user how long to wait."""
+        limiter = RateLimiter(max_requests=1, window_minutes=60)
+        limiter.is_allowed("1")
+
+        allowed, message = limiter.is_allowed("1")
+
+        assert not allowed
+        assert message == "Rate limit reached. Please wait 60 minutes."
+
+    def test_users_are_limited_independently(self):
+        """Test one user's usage does not affect another."""
+        limiter = RateLimiter(max_requests=1, window_minutes=60)
+        limiter.is_allowed("1")
+
+        assert limiter.is_allowed("2") == (True, "")
+
+    def test_tokens_refill_over_time(self):
+        """Test tokens come back as time passes."""
+        limiter = RateLimiter(max_requests=1, window_minutes=1)
+        limiter.is_allowed("1")
+        tokens, last = limiter.buckets["1"]
+        limiter.buckets["1"] = (tokens, last - 60)
+
+        assert limiter.is_allowed("1") == (True, "")
+
+    def test_evict_idle_drops_only_refilled_buckets(self):
+        """Test sweeping forgets users idle for a full window."""
+        limiter = RateLimiter(max_requests=1, window_minutes=1)
+        limiter.is_allowed("idle")
+        limiter.is_allowed("active")
+        tokens, last = limiter.buckets["idle"]
+        limiter.buckets["idle"] = (tokens, last - 60)
+
+        assert limiter.evict_idle() == 1
+        assert list(limiter.buckets) == ["active"]